@@ -0,0 +1,135 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+SAMPLE_DATASET = SRC_DIR.parent / "data" / "sample_output.json"
+
+# Budget for the time runner adds on top of a bare interpreter ("over python").
+# Interpreter startup itself depends on the host and is not counted.
+STARTUP_BUDGET_MS = 100.0
+
+def _cli(*argv: str) -> str:
+    return (
+        f"import sys, runner; sys.argv = ['runner.py', {', '.join(repr(a) for a in argv)}]\n"
+        "try:\n    runner.main()\nexcept SystemExit:\n    pass"
+    )
+
+def build_scenarios(workdir: Path) -> Dict[str, Tuple[str, bool]]:
+    """
+    Return name -> (code, scraping). Each scenario runs in a fresh interpreter so
+    module caches never hide import cost; non-scraping scenarios are real runs
+    against the sample dataset and are held to the startup budget.
+    """
+    sidecar = workdir / "sample_output.sidx"
+    quiet = ("--log-level", "WARNING")
+    subprocess.run(
+        [sys.executable, "-c", _cli("index", "--input", str(SAMPLE_DATASET), "--output", str(sidecar), *quiet)],
+        cwd=SRC_DIR,
+        check=True,
+    )
+    return {
+        "interpreter": ("pass", False),
+        "import runner": ("import runner", False),
+        "export": (
+            _cli("export", "--input", str(SAMPLE_DATASET), "--output", str(workdir / "out.csv"), *quiet),
+            False,
+        ),
+        "index": (
+            _cli("index", "--input", str(SAMPLE_DATASET), "--output", str(workdir / "out.sidx"), *quiet),
+            False,
+        ),
+        "query": (
+            _cli("query", "--index", str(sidecar), "--lat", "50.08", "--lng", "14.42", "--radius-m", "2000", *quiet),
+            False,
+        ),
+        "import contact_utils": ("import extractors.contact_utils", False),
+        "import html_cleaner": ("import extractors.html_cleaner", False),
+        "import mapy_parser": ("import extractors.mapy_parser", True),
+    }
+
+def _run_once(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC_DIR,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return (time.perf_counter() - start) * 1000.0
+
+def time_scenarios(scenarios: Dict[str, Tuple[str, bool]], repeat: int) -> Dict[str, float]:
+    """
+    Return the median wall time of each scenario. Scenarios are interleaved
+    round-robin so drift in machine load affects all of them equally.
+    """
+    timings: Dict[str, List[float]] = {name: [] for name in scenarios}
+    for _ in range(repeat):
+        for name, (code, _) in scenarios.items():
+            timings[name].append(_run_once(code))
+    return {name: statistics.median(values) for name, values in timings.items()}
+
+def heavy_modules(code: str) -> List[str]:
+    """
+    Return which of the parser stack's third-party packages a scenario imports.
+    """
+    probe = code + "\nimport sys\nprint('HEAVY:' + ','.join(m for m in ('requests', 'bs4') if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=SRC_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("HEAVY:"):
+            return [m for m in line[len("HEAVY:"):].split(",") if m]
+    return []
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start time of runner entry points.")
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per scenario.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=STARTUP_BUDGET_MS,
+        help=(
+            "Fail if a non-scraping scenario adds more than this over a bare interpreter "
+            "(default: %(default)s)."
+        ),
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenarios = build_scenarios(Path(tmp))
+        medians = time_scenarios(scenarios, args.repeat)
+        baseline = medians["interpreter"]
+
+        over_budget: List[str] = []
+        print(f"{'scenario':<24}{'median ms':>12}{'over python':>14}  {'budget':<8}heavy imports")
+        for name, (code, scraping) in scenarios.items():
+            median = medians[name]
+            overhead = max(0.0, median - baseline)
+            if scraping:
+                verdict = "-"
+            elif overhead <= args.budget_ms:
+                verdict = "ok"
+            else:
+                verdict = "OVER"
+                over_budget.append(name)
+            heavy = ", ".join(heavy_modules(code)) or "-"
+            print(f"{name:<24}{median:>12.1f}{overhead:>14.1f}  {verdict:<8}{heavy}")
+
+    print(f"\nBudget: {args.budget_ms:.0f} ms over python (interpreter startup here: {baseline:.1f} ms).")
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-thonimport re
-from typing import List, Optional
+import re
+from typing import TYPE_CHECKING, List, Optional
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 _EMAIL_RE = re.compile(
     r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
@@ -43,7 +44,7 @@ def extract_phone_numbers_from_text(text: str) -> List[str]:
         cleaned_numbers.append(cleaned)
     return cleaned_numbers
 
-def extract_website_from_text(soup: BeautifulSoup, base_url: Optional[str]) -> Optional[str]:
+def extract_website_from_text(soup: "BeautifulSoup", base_url: Optional[str]) -> Optional[str]:
     """
     Look for a website link in common contact areas or anchor tags that look like external sites.
     """
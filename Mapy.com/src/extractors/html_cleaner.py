@@ -1,11 +1,12 @@
-thonimport re
-from typing import Optional
+import re
+from typing import TYPE_CHECKING, Optional
 
-from bs4 import BeautifulSoup, Tag
+if TYPE_CHECKING:
+    from bs4 import Tag
 
 _WHITESPACE_RE = re.compile(r"\s+")
 
-def clean_text(node: Optional[Tag]) -> str:
+def clean_text(node: Optional["Tag"]) -> str:
     """
     Convert a BeautifulSoup node to stripped, normalized text.
     Returns an empty string if the node is None.
@@ -27,5 +28,7 @@ def safe_text_from_html(html: str) -> str:
     """
     Parse raw HTML and return stripped text for logging or fallback parsing.
     """
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html or "", "html.parser")
     return clean_text(soup)
\ No newline at end of file
@@ -0,0 +1,177 @@
+import logging
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"MAPYARC1"
+
+# Frame header: URL length, HTTP status (-1 for transport errors), compressed body length.
+_FRAME_HEADER = struct.Struct(">IhI")
+
+_MAX_URL_BYTES = 2**32 - 1
+
+FETCH_FAILED_STATUS = -1
+
+def _is_success(status: Optional[int]) -> bool:
+    return status is not None and 200 <= status < 400
+
+class ArchiveWriter:
+    """
+    Append-only writer for fetched pages. Each response is stored as one frame:
+    a fixed-size header, the UTF-8 URL and the zlib-compressed body. Frames are
+    self-describing, so a partially written archive stays readable up to the
+    last complete frame.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        compression_level: int = 6,
+        refresh: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.compression_level = compression_level
+        self.refresh = refresh
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # URLs already archived with a successful response. Failures are recorded
+        # again on later runs; readers keep the last frame for each URL.
+        self._succeeded = set()
+        valid_size = None
+        if self.path.exists():
+            with ArchiveReader(self.path) as existing:
+                self._succeeded.update(
+                    url for url in existing.urls() if _is_success(existing.status(url))
+                )
+                valid_size = existing.valid_size
+
+        # Drop a partial frame left behind by an interrupted run before appending.
+        if valid_size and valid_size < self.path.stat().st_size:
+            with self.path.open("r+b") as f:
+                f.truncate(valid_size)
+
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        self._fh = self.path.open("ab")
+        if is_new:
+            self._fh.write(_MAGIC)
+
+    def record(self, url: str, status: int, body: Optional[str]) -> None:
+        """
+        Append a response frame. Unless ``refresh`` is set, URLs that already
+        have a successful response in the archive are skipped. A failure never
+        replaces a successful response, even when refreshing.
+        """
+        if url in self._succeeded and (not self.refresh or not _is_success(status)):
+            return
+
+        url_bytes = url.encode("utf-8")
+        if len(url_bytes) > _MAX_URL_BYTES:
+            logger.warning("URL too long to archive (%d bytes); skipping %s...", len(url_bytes), url[:100])
+            return
+
+        payload = zlib.compress((body or "").encode("utf-8"), self.compression_level)
+        self._fh.write(_FRAME_HEADER.pack(len(url_bytes), status, len(payload)))
+        self._fh.write(url_bytes)
+        self._fh.write(payload)
+        if _is_success(status):
+            self._succeeded.add(url)
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class ArchiveReader:
+    """
+    Random-access reader over an archive written by ArchiveWriter. Opening the
+    archive only walks frame headers to build the URL index; bodies are
+    decompressed on demand from a memory map.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Archive not found: {self.path}")
+
+        self._fh = self.path.open("rb")
+        self._mm: Optional[mmap.mmap] = None
+        # url -> (body offset, body length, status)
+        self._index: Dict[str, Tuple[int, int, int]] = {}
+        self.valid_size = 0
+
+        size = self.path.stat().st_size
+        if size == 0:
+            return
+
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f"Not a Mapy archive: {self.path}")
+
+        self._build_index(size)
+
+    def _build_index(self, size: int) -> None:
+        offset = len(_MAGIC)
+        while offset + _FRAME_HEADER.size <= size:
+            url_len, status, body_len = _FRAME_HEADER.unpack_from(self._mm, offset)
+            url_start = offset + _FRAME_HEADER.size
+            body_start = url_start + url_len
+            end = body_start + body_len
+            if end > size:
+                break
+
+            url = self._mm[url_start:body_start].decode("utf-8")
+            self._index[url] = (body_start, body_len, status)
+            offset = end
+
+        self.valid_size = offset
+        if offset < size:
+            logger.warning("Truncated frame at offset %d in %s; ignoring tail", offset, self.path)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._index
+
+    def urls(self) -> List[str]:
+        return list(self._index.keys())
+
+    def status(self, url: str) -> Optional[int]:
+        entry = self._index.get(url)
+        return entry[2] if entry is not None else None
+
+    def get(self, url: str) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Return (status, body) for a recorded URL, or (None, None) if it was
+        never recorded.
+        """
+        entry = self._index.get(url)
+        if entry is None:
+            return None, None
+
+        body_start, body_len, status = entry
+        body = zlib.decompress(self._mm[body_start : body_start + body_len]).decode("utf-8")
+        return status, body
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if not self._fh.closed:
+            self._fh.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
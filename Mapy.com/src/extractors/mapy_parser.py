@@ -1,19 +1,22 @@
-thonimport logging
+import logging
 import time
 import urllib.parse
 from dataclasses import dataclass, asdict
-from typing import Any, Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
-import requests
 from bs4 import BeautifulSoup
 
 from .html_cleaner import clean_text
+from .http_archive import FETCH_FAILED_STATUS, ArchiveReader, ArchiveWriter
 from .contact_utils import (
     extract_emails_from_text,
     extract_phone_numbers_from_text,
     extract_website_from_text,
 )
 
+if TYPE_CHECKING:
+    import requests
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -43,19 +46,36 @@ class MapyScraper:
         user_agent: str = "MapyScraper/1.0",
         max_retries: int = 3,
         sleep_between_requests_ms: int = 500,
+        record_archive: Optional[ArchiveWriter] = None,
+        replay_archive: Optional[ArchiveReader] = None,
     ) -> None:
+        if record_archive is not None and replay_archive is not None:
+            raise ValueError("record_archive and replay_archive are mutually exclusive.")
+
         self.base_url = base_url.rstrip("/")
         self.timeout_seconds = timeout_seconds
         self.max_retries = max_retries
         self.sleep_between_requests_ms = sleep_between_requests_ms
-
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": user_agent,
-                "Accept-Language": "en-US,en;q=0.9",
-            }
-        )
+        self.user_agent = user_agent
+        self.record_archive = record_archive
+        self.replay_archive = replay_archive
+
+        self._session: Optional["requests.Session"] = None
+
+    @property
+    def session(self) -> "requests.Session":
+        # requests is only imported once a live fetch is needed, so replay runs never pay for it.
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+            self._session.headers.update(
+                {
+                    "User-Agent": self.user_agent,
+                    "Accept-Language": "en-US,en;q=0.9",
+                }
+            )
+        return self._session
 
     # ------------- Public API -------------
 
@@ -292,23 +312,47 @@ class MapyScraper:
         return urllib.parse.urljoin(self.base_url + "/", href.lstrip("/"))
 
     def _fetch_with_retries(self, url: str) -> Optional[str]:
+        if self.replay_archive is not None:
+            return self._fetch_from_archive(url)
+
+        status, text = self._fetch_from_network(url)
+        if self.record_archive is not None:
+            self.record_archive.record(url, status, text)
+        return text
+
+    def _fetch_from_network(self, url: str) -> Tuple[int, Optional[str]]:
+        import requests
+
+        status = FETCH_FAILED_STATUS
         for attempt in range(1, self.max_retries + 1):
             try:
                 logger.debug("Fetching %s (attempt %d/%d)", url, attempt, self.max_retries)
                 resp = self.session.get(url, timeout=self.timeout_seconds)
+                status = resp.status_code
                 if resp.status_code >= 400:
                     logger.warning("Got HTTP %s for %s", resp.status_code, url)
                     if 500 <= resp.status_code < 600 and attempt < self.max_retries:
                         self._sleep()
                         continue
-                    return None
-                return resp.text
+                    return status, None
+                return status, resp.text
             except requests.RequestException as exc:
                 logger.warning("Request to %s failed (%s)", url, exc)
+                status = FETCH_FAILED_STATUS
                 if attempt >= self.max_retries:
-                    return None
+                    return status, None
                 self._sleep()
-        return None
+        return status, None
+
+    def _fetch_from_archive(self, url: str) -> Optional[str]:
+        status, text = self.replay_archive.get(url)
+        if status is None:
+            logger.warning("No archived response for %s", url)
+            return None
+        if status == FETCH_FAILED_STATUS or status >= 400:
+            logger.debug("Archived response for %s was a failure (status %s)", url, status)
+            return None
+        return text
 
     def _sleep(self) -> None:
         time.sleep(self.sleep_between_requests_ms / 1000.0)
\ No newline at end of file
@@ -1,4 +1,4 @@
-thonimport csv
+import csv
 import json
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Union
@@ -0,0 +1,486 @@
+import json
+import math
+import mmap
+import re
+import struct
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+_MAGIC = b"MAPYSIX2"
+
+# magic, cell size (degrees), record count, point count, offsets of the points,
+# record offsets, records and postings sections, then for each term table
+# (category, name) its offset and entry count, and the offset and length of the term strings.
+_HEADER = struct.Struct("<8sdIIQQQQQQQQQQ")
+
+# Grid cell key, lat, lng, record id. Points are stored sorted by cell key.
+_POINT = struct.Struct("<QddI")
+# Leading cell key of a point, read alone during binary search.
+_POINT_KEY = struct.Struct("<Q")
+_OFFSET = struct.Struct("<Q")
+_POSTING = struct.Struct("<I")
+# Term string offset and length in the strings section, postings start and count.
+# Each term table is sorted by the UTF-8 bytes of its terms.
+_TERM = struct.Struct("<QIII")
+
+_EARTH_RADIUS_M = 6371008.8
+_TOKEN_RE = re.compile(r"\w+", flags=re.UNICODE)
+
+DEFAULT_CELL_SIZE_DEG = 0.01
+# About 1 m at the equator; finer grids only add rows without speeding up lookups.
+MIN_CELL_SIZE_DEG = 1e-5
+
+def validate_cell_size(cell_size_deg: float) -> None:
+    if not math.isfinite(cell_size_deg) or cell_size_deg < MIN_CELL_SIZE_DEG:
+        raise ValueError(f"cell_size_deg must be a finite number >= {MIN_CELL_SIZE_DEG}.")
+    # Longitude cells are stored in the low 32 bits of the cell key.
+    if 360.0 / cell_size_deg >= 2**32:
+        raise ValueError("cell_size_deg is too small for 32-bit longitude cells.")
+
+def _cell_key(lat: float, lng: float, cell_size: float) -> int:
+    lat_cell = int((lat + 90.0) // cell_size)
+    lng_cell = int((lng + 180.0) // cell_size)
+    return (lat_cell << 32) | lng_cell
+
+def _normalize_term(text: str) -> str:
+    return (text or "").strip().lower()
+
+def _name_tokens(name: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall((name or "").lower())
+
+def _coordinates(record: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    coords = record.get("coordinates")
+    if not isinstance(coords, dict):
+        return None
+    try:
+        lat = float(coords["lat"])
+        lng = float(coords["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        return None
+    return lat, lng
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def export_to_spatial_index(
+    records: Iterable[Dict[str, Any]],
+    path: Union[str, Path],
+    cell_size_deg: float = DEFAULT_CELL_SIZE_DEG,
+) -> None:
+    """
+    Write a sidecar index over normalized records: a grid of coordinates sorted
+    by cell, category and name-token posting lists, and the records themselves
+    as compact JSON so lookups never need the source dataset.
+    """
+    validate_cell_size(cell_size_deg)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows: List[Dict[str, Any]] = list(records)
+
+    points: List[Tuple[int, float, float, int]] = []
+    categories: Dict[str, List[int]] = {}
+    names: Dict[str, List[int]] = {}
+    encoded: List[bytes] = []
+
+    for record_id, record in enumerate(rows):
+        encoded.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+        coords = _coordinates(record)
+        if coords is not None:
+            lat, lng = coords
+            points.append((_cell_key(lat, lng, cell_size_deg), lat, lng, record_id))
+
+        category = _normalize_term(record.get("category"))
+        if category:
+            categories.setdefault(category, []).append(record_id)
+
+        for token in dict.fromkeys(_name_tokens(record.get("name"))):
+            names.setdefault(token, []).append(record_id)
+
+    points.sort()
+
+    postings: List[int] = []
+    strings = bytearray()
+    term_tables: List[List[Tuple[int, int, int, int]]] = []
+    for table in (categories, names):
+        entries: List[Tuple[int, int, int, int]] = []
+        for term_bytes, ids in sorted((term.encode("utf-8"), ids) for term, ids in table.items()):
+            entries.append((len(strings), len(term_bytes), len(postings), len(ids)))
+            strings += term_bytes
+            postings.extend(ids)
+        term_tables.append(entries)
+    category_terms, name_terms = term_tables
+
+    points_offset = _HEADER.size
+    record_offsets_offset = points_offset + len(points) * _POINT.size
+    records_offset = record_offsets_offset + (len(encoded) + 1) * _OFFSET.size
+    postings_offset = records_offset + sum(len(blob) for blob in encoded)
+    category_terms_offset = postings_offset + len(postings) * _POSTING.size
+    name_terms_offset = category_terms_offset + len(category_terms) * _TERM.size
+    strings_offset = name_terms_offset + len(name_terms) * _TERM.size
+
+    with path.open("wb") as f:
+        f.write(
+            _HEADER.pack(
+                _MAGIC,
+                cell_size_deg,
+                len(encoded),
+                len(points),
+                points_offset,
+                record_offsets_offset,
+                records_offset,
+                postings_offset,
+                category_terms_offset,
+                len(category_terms),
+                name_terms_offset,
+                len(name_terms),
+                strings_offset,
+                len(strings),
+            )
+        )
+        for point in points:
+            f.write(_POINT.pack(*point))
+
+        position = 0
+        for blob in encoded:
+            f.write(_OFFSET.pack(position))
+            position += len(blob)
+        f.write(_OFFSET.pack(position))
+
+        for blob in encoded:
+            f.write(blob)
+        for record_id in postings:
+            f.write(_POSTING.pack(record_id))
+        for entries in term_tables:
+            for entry in entries:
+                f.write(_TERM.pack(*entry))
+        f.write(strings)
+
+class SpatialIndex:
+    """
+    Read-only view over a sidecar written by export_to_spatial_index. The file
+    is memory-mapped and nothing beyond the header is read on open: points and
+    term tables are binary-searched in place, and records are decoded on demand
+    for the ids a query returns.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Spatial index not found: {self.path}")
+
+        self._fh = self.path.open("rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:
+            self._fh.close()
+            raise ValueError(f"Not a Mapy spatial index: {self.path}") from exc
+
+        if len(self._mm) < _HEADER.size or self._mm[: len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f"Not a Mapy spatial index: {self.path}")
+
+        try:
+            self._read_header()
+        except (struct.error, ValueError) as exc:
+            self.close()
+            raise ValueError(f"Not a Mapy spatial index: {self.path}") from exc
+
+    def _read_header(self) -> None:
+        (
+            _,
+            self.cell_size_deg,
+            self._record_count,
+            self._point_count,
+            self._points_offset,
+            self._record_offsets_offset,
+            self._records_offset,
+            self._postings_offset,
+            category_terms_offset,
+            category_terms_count,
+            name_terms_offset,
+            name_terms_count,
+            self._strings_offset,
+            strings_length,
+        ) = _HEADER.unpack_from(self._mm, 0)
+
+        validate_cell_size(self.cell_size_deg)
+
+        # kind -> (offset, entry count) of its term table.
+        self._term_tables: Dict[str, Tuple[int, int]] = {
+            "category": (category_terms_offset, category_terms_count),
+            "name": (name_terms_offset, name_terms_count),
+        }
+
+        # Sections are laid out back to back; check that they fit the file.
+        size = len(self._mm)
+        expected = [
+            (self._points_offset, self._point_count * _POINT.size),
+            (self._record_offsets_offset, (self._record_count + 1) * _OFFSET.size),
+            (category_terms_offset, category_terms_count * _TERM.size),
+            (name_terms_offset, name_terms_count * _TERM.size),
+            (self._strings_offset, strings_length),
+        ]
+        for offset, length in expected:
+            if offset < _HEADER.size or offset + length > size:
+                raise ValueError("Section out of bounds")
+
+    # ------------- Public API -------------
+
+    def __len__(self) -> int:
+        return self._record_count
+
+    def record(self, record_id: int) -> Dict[str, Any]:
+        if not 0 <= record_id < self._record_count:
+            raise IndexError(f"Record id out of range: {record_id}")
+        start = _OFFSET.unpack_from(self._mm, self._record_offsets_offset + record_id * _OFFSET.size)[0]
+        end = _OFFSET.unpack_from(self._mm, self._record_offsets_offset + (record_id + 1) * _OFFSET.size)[0]
+        return json.loads(self._mm[self._records_offset + start : self._records_offset + end].decode("utf-8"))
+
+    def categories(self) -> List[str]:
+        offset, count = self._term_tables["category"]
+        return [self._term_at(offset, i)[0].decode("utf-8") for i in range(count)]
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return records matching the category and/or containing every word of
+        ``name`` (both case-insensitive), decoding at most ``limit`` records.
+        """
+        ids = self._filter_ids(category, name)
+        if ids is None:
+            return []
+        return [self.record(rid) for rid in islice(sorted(ids), limit)]
+
+    def bbox(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        category: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return up to ``limit`` records inside the box. ``west > east`` denotes a
+        box crossing the antimeridian.
+        """
+        allowed = self._filter_ids(category, name)
+        ids = (
+            rid
+            for _, _, rid in self._scan_bbox(south, west, north, east)
+            if allowed is None or rid in allowed
+        )
+        return [self.record(rid) for rid in islice(ids, limit)]
+
+    def radius(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        category: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Return up to ``limit`` (distance in meters, record) pairs within
+        ``radius_m``, nearest first.
+        """
+        hits = self._radius_ids(lat, lng, radius_m, self._filter_ids(category, name))
+        return [(dist, self.record(rid)) for dist, rid in islice(hits, limit)]
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        category: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Return the ``k`` nearest (distance in meters, record) pairs, nearest first.
+        """
+        if k <= 0:
+            return []
+        allowed = self._filter_ids(category, name)
+        if allowed is not None and not allowed:
+            return []
+
+        # Grow the search radius until it holds k hits; every point closer than the
+        # k-th hit is then guaranteed to be inside the searched circle.
+        radius_m = math.radians(self.cell_size_deg) * _EARTH_RADIUS_M
+        while radius_m < math.pi * _EARTH_RADIUS_M:
+            hits = self._radius_ids(lat, lng, radius_m, allowed)
+            if len(hits) >= k:
+                return [(dist, self.record(rid)) for dist, rid in hits[:k]]
+            radius_m *= 4
+
+        hits = sorted(
+            (haversine_m(lat, lng, p_lat, p_lng), rid)
+            for p_lat, p_lng, rid in self._iter_points(0, self._point_count)
+            if allowed is None or rid in allowed
+        )
+        return [(dist, self.record(rid)) for dist, rid in hits[:k]]
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if not self._fh.closed:
+            self._fh.close()
+
+    def __enter__(self) -> "SpatialIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------- Internals -------------
+
+    def _term_at(self, table_offset: int, i: int) -> Tuple[bytes, int, int]:
+        string_offset, length, start, count = _TERM.unpack_from(self._mm, table_offset + i * _TERM.size)
+        string_start = self._strings_offset + string_offset
+        return self._mm[string_start : string_start + length], start, count
+
+    def _find_term(self, kind: str, term: str) -> Optional[Tuple[int, int]]:
+        """
+        Binary-search a term table; return (postings start, count) or None.
+        """
+        table_offset, table_count = self._term_tables[kind]
+        target = term.encode("utf-8")
+        lo, hi = 0, table_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(table_offset, mid)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < table_count:
+            found, start, count = self._term_at(table_offset, lo)
+            if found == target:
+                return start, count
+        return None
+
+    def _postings(self, kind: str, term: str) -> List[int]:
+        entry = self._find_term(kind, term)
+        if entry is None:
+            return []
+        start, count = entry
+        offset = self._postings_offset + start * _POSTING.size
+        return [rid for (rid,) in _POSTING.iter_unpack(self._mm[offset : offset + count * _POSTING.size])]
+
+    def _filter_ids(self, category: Optional[str], name: Optional[str]) -> Optional[Set[int]]:
+        """
+        Intersect the posting lists for the given filters. None means "no filter".
+        """
+        ids: Optional[Set[int]] = None
+        if category is not None:
+            ids = set(self._postings("category", _normalize_term(category)))
+        if name is not None:
+            for token in _name_tokens(name) or [""]:
+                matches = self._postings("name", token)
+                ids = set(matches) if ids is None else ids.intersection(matches)
+        return ids
+
+    def _point_key(self, i: int) -> int:
+        return _POINT_KEY.unpack_from(self._mm, self._points_offset + i * _POINT.size)[0]
+
+    def _lower_bound(self, key: int) -> int:
+        lo, hi = 0, self._point_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._point_key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _iter_points(self, start: int, stop: int) -> Iterator[Tuple[float, float, int]]:
+        for i in range(start, stop):
+            _, lat, lng, rid = _POINT.unpack_from(self._mm, self._points_offset + i * _POINT.size)
+            yield lat, lng, rid
+
+    def _scan_bbox(
+        self, south: float, west: float, north: float, east: float
+    ) -> Iterator[Tuple[float, float, int]]:
+        south = max(-90.0, south)
+        north = min(90.0, north)
+        if south > north:
+            return
+
+        lng_ranges = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+        cell = self.cell_size_deg
+        lat_lo = int((south + 90.0) // cell)
+        lat_hi = int((north + 90.0) // cell)
+
+        lat_cell = lat_lo
+        while lat_cell <= lat_hi:
+            # Jump straight to the next latitude row that holds any point.
+            i = self._lower_bound(lat_cell << 32)
+            if i >= self._point_count:
+                return
+            lat_cell = self._point_key(i) >> 32
+            if lat_cell > lat_hi:
+                return
+
+            for range_west, range_east in lng_ranges:
+                range_west = max(-180.0, range_west)
+                range_east = min(180.0, range_east)
+                lo_key = (lat_cell << 32) | int((range_west + 180.0) // cell)
+                hi_key = (lat_cell << 32) | int((range_east + 180.0) // cell)
+
+                i = self._lower_bound(lo_key)
+                while i < self._point_count:
+                    key, lat, lng, rid = _POINT.unpack_from(self._mm, self._points_offset + i * _POINT.size)
+                    if key > hi_key:
+                        break
+                    if south <= lat <= north and range_west <= lng <= range_east:
+                        yield lat, lng, rid
+                    i += 1
+
+            lat_cell += 1
+
+    def _radius_ids(
+        self, lat: float, lng: float, radius_m: float, allowed: Optional[Set[int]]
+    ) -> List[Tuple[float, int]]:
+        angular = radius_m / _EARTH_RADIUS_M
+        dlat = math.degrees(angular)
+        south = lat - dlat
+        north = lat + dlat
+
+        # Bounding longitudes of a spherical cap; the full circle if it reaches a pole.
+        ratio = math.sin(angular) / max(math.cos(math.radians(lat)), 1e-12)
+        if south <= -90.0 or north >= 90.0 or angular >= math.pi / 2 or ratio >= 1.0:
+            west, east = -180.0, 180.0
+        else:
+            dlng = math.degrees(math.asin(ratio))
+            west = lng - dlng
+            east = lng + dlng
+            if west < -180.0:
+                west += 360.0
+            if east > 180.0:
+                east -= 360.0
+
+        hits: List[Tuple[float, int]] = []
+        for p_lat, p_lng, rid in self._scan_bbox(south, west, north, east):
+            if allowed is not None and rid not in allowed:
+                continue
+            dist = haversine_m(lat, lng, p_lat, p_lng)
+            if dist <= radius_m:
+                hits.append((dist, rid))
+        hits.sort()
+        return hits
@@ -0,0 +1,36 @@
+from typing import Any, Dict, Iterable, List
+
+from .dedupe import record_key
+
+def diff_records(baseline: Iterable[Dict], current: Iterable[Dict]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compare two normalized datasets record by record, matching records with the
+    same key used for deduplication.
+
+    Returns:
+    {
+        "added":   [record, ...],    # only in current
+        "removed": [record, ...],    # only in baseline
+        "changed": [{"key": str, "fields": {field: {"baseline": ..., "current": ...}}}, ...]
+    }
+    """
+    baseline_by_key = {record_key(rec): rec for rec in baseline}
+    current_by_key = {record_key(rec): rec for rec in current}
+
+    added = [rec for key, rec in current_by_key.items() if key not in baseline_by_key]
+    removed = [rec for key, rec in baseline_by_key.items() if key not in current_by_key]
+
+    changed: List[Dict[str, Any]] = []
+    for key, cur in current_by_key.items():
+        base = baseline_by_key.get(key)
+        if base is None:
+            continue
+
+        fields: Dict[str, Dict[str, Any]] = {}
+        for field in sorted(set(base.keys()) | set(cur.keys())):
+            if base.get(field) != cur.get(field):
+                fields[field] = {"baseline": base.get(field), "current": cur.get(field)}
+        if fields:
+            changed.append({"key": key, "fields": fields})
+
+    return {"added": added, "removed": removed, "changed": changed}
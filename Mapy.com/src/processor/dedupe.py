@@ -1,6 +1,6 @@
-thonfrom typing import Dict, Iterable, List
+from typing import Dict, Iterable, List
 
-def _build_key(record: Dict) -> str:
+def record_key(record: Dict) -> str:
     """
     Build a stable, deterministic key for deduplication based on URL if present,
     otherwise on a normalized combination of name + address.
@@ -21,7 +21,7 @@ def dedupe_records(records: Iterable[Dict]) -> List[Dict]:
     deduped: List[Dict] = []
 
     for rec in records:
-        key = _build_key(rec)
+        key = record_key(rec)
         if key in seen_keys:
             continue
         seen_keys.add(key)
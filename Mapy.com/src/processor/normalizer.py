@@ -1,4 +1,4 @@
-thonfrom typing import Any, Dict, Optional
+from typing import Any, Dict, Optional
 
 def _ensure_coordinates(raw: Any) -> Optional[Dict[str, float]]:
     if raw is None:
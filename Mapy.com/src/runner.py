@@ -1,13 +1,27 @@
-thonimport argparse
+import argparse
 import json
 import logging
+import math
+import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-from extractors.mapy_parser import MapyScraper, MapyJob
+from extractors.http_archive import ArchiveReader, ArchiveWriter
 from processor.normalizer import normalize_record
 from processor.dedupe import dedupe_records
-from outputs.dataset_exporter import export_to_json
+from processor.dataset_diff import diff_records
+from outputs.dataset_exporter import export_to_csv, export_to_json
+from outputs.spatial_index import (
+    DEFAULT_CELL_SIZE_DEG,
+    SpatialIndex,
+    export_to_spatial_index,
+    validate_cell_size,
+)
+
+# The parser stack (requests, bs4) is imported only by code paths that scrape,
+# keeping startup cheap for subcommands such as ``export``.
+if TYPE_CHECKING:
+    from extractors.mapy_parser import MapyScraper
 
 def load_settings(settings_path: Path) -> Dict[str, Any]:
     if not settings_path.exists():
@@ -34,7 +48,26 @@ def load_jobs(input_path: Path) -> List[Dict[str, Any]]:
         raise ValueError("Input JSON must be an array of job objects.")
     return data
 
-def build_scraper_from_settings(settings: Dict[str, Any]) -> MapyScraper:
+def load_dataset(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        raise FileNotFoundError(f"Dataset file not found: {path}")
+    with path.open("r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as exc:
+            raise RuntimeError(f"Invalid JSON in dataset file: {exc}") from exc
+
+    if not isinstance(data, list):
+        raise ValueError("Dataset JSON must be an array of records.")
+    return data
+
+def build_scraper_from_settings(
+    settings: Dict[str, Any],
+    record_archive: Optional[ArchiveWriter] = None,
+    replay_archive: Optional[ArchiveReader] = None,
+) -> "MapyScraper":
+    from extractors.mapy_parser import MapyScraper
+
     base_url = settings.get("baseUrl", "https://mapy.com")
     timeout = settings.get("timeoutSeconds", 15)
     user_agent = settings.get("userAgent", "MapyScraper/1.0 (+https://bitbash.dev)")
@@ -47,11 +80,169 @@ def build_scraper_from_settings(settings: Dict[str, Any]) -> MapyScraper:
         user_agent=user_agent,
         max_retries=max_retries,
         sleep_between_requests_ms=sleep_ms,
+        record_archive=record_archive,
+        replay_archive=replay_archive,
+    )
+
+def configure_logging(log_level: str) -> None:
+    logging.basicConfig(
+        level=getattr(logging, log_level.upper(), logging.INFO),
+        format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+    )
+
+def add_export_parser(subparsers: Any, parents: List[argparse.ArgumentParser]) -> argparse.ArgumentParser:
+    parser = subparsers.add_parser(
+        "export",
+        parents=parents,
+        help="Convert a dataset to JSON or CSV.",
+        description="Convert an exported dataset to JSON or CSV without loading the scraper.",
+    )
+    parser.add_argument("--input", type=str, required=True, help="Path to dataset JSON.")
+    parser.add_argument("--output", type=str, required=True, help="Path of the converted dataset.")
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["json", "csv"],
+        default=None,
+        help="Output format. Inferred from the output file extension when omitted.",
+    )
+    return parser
+
+def export_command(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    output_path = Path(args.output)
+    fmt = args.format or ("csv" if output_path.suffix.lower() == ".csv" else "json")
+
+    records = load_dataset(Path(args.input))
+    logging.info("Exporting %d records to %s as %s", len(records), output_path, fmt)
+    if fmt == "csv":
+        export_to_csv(records, output_path)
+    else:
+        export_to_json(records, output_path)
+
+def add_index_parser(subparsers: Any, parents: List[argparse.ArgumentParser]) -> argparse.ArgumentParser:
+    parser = subparsers.add_parser(
+        "index",
+        parents=parents,
+        help="Build a spatial index sidecar for a dataset.",
+        description="Build a spatial/category/name index sidecar for an exported dataset.",
+    )
+    parser.add_argument("--input", type=str, required=True, help="Path to dataset JSON.")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path of the index sidecar. Defaults to the input path with a .sidx suffix.",
+    )
+    parser.add_argument(
+        "--cell-size",
+        type=float,
+        default=DEFAULT_CELL_SIZE_DEG,
+        help="Grid cell size in degrees (default: %(default)s, roughly 1 km).",
+    )
+    return parser
+
+def index_command(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    try:
+        validate_cell_size(args.cell_size)
+    except ValueError as exc:
+        parser.error(f"--cell-size: {exc}")
+
+    input_path = Path(args.input)
+    output_path = Path(args.output) if args.output else input_path.with_suffix(".sidx")
+
+    records = load_dataset(input_path)
+    logging.info("Indexing %d records into %s", len(records), output_path)
+    export_to_spatial_index(records, output_path, cell_size_deg=args.cell_size)
+
+def add_query_parser(subparsers: Any, parents: List[argparse.ArgumentParser]) -> argparse.ArgumentParser:
+    parser = subparsers.add_parser(
+        "query",
+        parents=parents,
+        help="Query a spatial index sidecar.",
+        description="Query a dataset index sidecar by radius, bounding box, nearest-k, category or name.",
+    )
+    parser.add_argument("--index", type=str, required=True, help="Path to the index sidecar.")
+    parser.add_argument("--lat", type=float, default=None, help="Latitude for --radius-m / --nearest.")
+    parser.add_argument("--lng", type=float, default=None, help="Longitude for --radius-m / --nearest.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--radius-m", type=float, default=None, help="Return records within this many meters.")
+    mode.add_argument("--nearest", type=int, default=None, help="Return the N nearest records.")
+    mode.add_argument(
+        "--bbox",
+        type=float,
+        nargs=4,
+        metavar=("SOUTH", "WEST", "NORTH", "EAST"),
+        default=None,
+        help="Return records inside the bounding box.",
+    )
+    parser.add_argument("--category", type=str, default=None, help="Only return records in this category.")
+    parser.add_argument("--name", type=str, default=None, help="Only return records whose name contains these words.")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of records to print.")
+    return parser
+
+def _in_range(value: float, low: float, high: float) -> bool:
+    # Comparisons with NaN are always false, so NaN is rejected as well.
+    return low <= value <= high
+
+def query_command(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    if (args.radius_m is not None or args.nearest is not None) and (args.lat is None or args.lng is None):
+        parser.error("--radius-m and --nearest require --lat and --lng")
+    if args.radius_m is None and args.nearest is None and args.bbox is None and not (args.category or args.name):
+        parser.error("one of --radius-m, --nearest, --bbox, --category or --name is required")
+    if args.lat is not None and not _in_range(args.lat, -90.0, 90.0):
+        parser.error("--lat must be between -90 and 90")
+    if args.lng is not None and not _in_range(args.lng, -180.0, 180.0):
+        parser.error("--lng must be between -180 and 180")
+    if args.radius_m is not None and not (math.isfinite(args.radius_m) and args.radius_m >= 0):
+        parser.error("--radius-m must be a finite, non-negative number")
+    if args.bbox is not None:
+        south, west, north, east = args.bbox
+        if not (_in_range(south, -90.0, 90.0) and _in_range(north, -90.0, 90.0)) or south > north:
+            parser.error("--bbox SOUTH and NORTH must be between -90 and 90 with SOUTH <= NORTH")
+        if not (_in_range(west, -180.0, 180.0) and _in_range(east, -180.0, 180.0)):
+            parser.error("--bbox WEST and EAST must be between -180 and 180")
+
+    with SpatialIndex(args.index) as index:
+        if args.radius_m is not None:
+            hits = index.radius(
+                args.lat, args.lng, args.radius_m, category=args.category, name=args.name, limit=args.limit
+            )
+            results = [{**rec, "distanceMeters": round(dist, 1)} for dist, rec in hits]
+        elif args.nearest is not None:
+            k = args.nearest if args.limit is None else min(args.nearest, args.limit)
+            hits = index.nearest(args.lat, args.lng, k, category=args.category, name=args.name)
+            results = [{**rec, "distanceMeters": round(dist, 1)} for dist, rec in hits]
+        elif args.bbox is not None:
+            results = index.bbox(*args.bbox, category=args.category, name=args.name, limit=args.limit)
+        else:
+            results = index.search(category=args.category, name=args.name, limit=args.limit)
+
+    json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+CommandHandler = Callable[[argparse.Namespace, argparse.ArgumentParser], None]
+
+# name -> (parser builder, handler). Scraping is the default when no subcommand is given.
+SUBCOMMANDS: Dict[str, Tuple[Callable[..., argparse.ArgumentParser], CommandHandler]] = {
+    "export": (add_export_parser, export_command),
+    "index": (add_index_parser, index_command),
+    "query": (add_query_parser, query_command),
+}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    # --log-level is accepted both before and after a subcommand. SUPPRESS keeps a
+    # subcommand's unset option from overwriting a value given before it.
+    log_parent = argparse.ArgumentParser(add_help=False)
+    log_parent.add_argument(
+        "--log-level",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL). Default: INFO.",
     )
 
-def main() -> None:
     parser = argparse.ArgumentParser(
-        description="Mapy.com Places & Business Data Scraper (Bitbash demo implementation)"
+        description="Mapy.com Places & Business Data Scraper (Bitbash demo implementation)",
+        parents=[log_parent],
     )
     parser.add_argument(
         "--input",
@@ -71,27 +262,131 @@ def main() -> None:
         default=str(Path("src") / "config" / "settings.example.json"),
         help="Path to settings JSON file.",
     )
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument(
+        "--record-archive",
+        type=str,
+        default=None,
+        help="Append every fetched response to this HTTP archive for later offline replay.",
+    )
+    archive_group.add_argument(
+        "--replay-archive",
+        type=str,
+        default=None,
+        help="Serve all fetches from this HTTP archive instead of the network.",
+    )
     parser.add_argument(
-        "--log-level",
+        "--refresh-archive",
+        action="store_true",
+        help="With --record-archive, record every URL again even if the archive already has a successful response.",
+    )
+    parser.add_argument(
+        "--spatial-index",
         type=str,
-        default="INFO",
-        help="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL).",
+        default=None,
+        help="Also write a spatial/category/name index sidecar for the output dataset to this path.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Baseline output JSON to diff the new dataset against.",
+    )
+    parser.add_argument(
+        "--diff-output",
+        type=str,
+        default=None,
+        help="Path where the baseline diff is written as JSON (requires --baseline).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Profile the pipeline with cProfile and write stats to this path.",
     )
 
-    args = parser.parse_args()
-
-    logging.basicConfig(
-        level=getattr(logging, args.log_level.upper(), logging.INFO),
-        format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+    subparsers = parser.add_subparsers(
+        dest="command",
+        title="subcommands",
+        description="Run one of these instead of scraping.",
     )
+    command_parsers = {
+        name: add_parser(subparsers, [log_parent]) for name, (add_parser, _) in SUBCOMMANDS.items()
+    }
+
+    args = parser.parse_args(argv)
+    # Resolved here rather than via set_defaults, which would also change the
+    # default of the --log-level action shared with every subparser.
+    args.log_level = getattr(args, "log_level", "INFO")
+    configure_logging(args.log_level)
 
+    if args.command:
+        handler = SUBCOMMANDS[args.command][1]
+        handler(args, command_parsers[args.command])
+        return
+
+    scrape_command(args, parser)
+
+def scrape_command(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
     input_path = Path(args.input)
     output_path = Path(args.output)
     settings_path = Path(args.settings)
 
+    if args.diff_output and not args.baseline:
+        parser.error("--diff-output requires --baseline")
+
+    if args.refresh_archive and not args.record_archive:
+        parser.error("--refresh-archive requires --record-archive")
+
+    record_archive = (
+        ArchiveWriter(args.record_archive, refresh=args.refresh_archive) if args.record_archive else None
+    )
+    replay_archive = ArchiveReader(args.replay_archive) if args.replay_archive else None
+    if replay_archive is not None:
+        logging.info("Replaying %d archived responses from %s", len(replay_archive), args.replay_archive)
+
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        deduped_records = run_pipeline(
+            input_path, output_path, settings_path, record_archive, replay_archive
+        )
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            logging.info("Profile written to %s", args.profile)
+        if record_archive is not None:
+            record_archive.close()
+        if replay_archive is not None:
+            replay_archive.close()
+
+    if args.spatial_index:
+        logging.info("Writing spatial index to %s", args.spatial_index)
+        export_to_spatial_index(deduped_records, args.spatial_index)
+
+    if args.baseline:
+        report_baseline_diff(Path(args.baseline), deduped_records, args.diff_output)
+
+    logging.info("Done.")
+
+def run_pipeline(
+    input_path: Path,
+    output_path: Path,
+    settings_path: Path,
+    record_archive: Optional[ArchiveWriter] = None,
+    replay_archive: Optional[ArchiveReader] = None,
+) -> List[Dict[str, Any]]:
+    from extractors.mapy_parser import MapyJob
+
     logging.info("Loading settings from %s", settings_path)
     settings = load_settings(settings_path)
-    scraper = build_scraper_from_settings(settings)
+    scraper = build_scraper_from_settings(settings, record_archive, replay_archive)
 
     logging.info("Loading jobs from %s", input_path)
     job_dicts = load_jobs(input_path)
@@ -136,7 +431,27 @@ def main() -> None:
     logging.info("Exporting dataset to %s", output_path)
     export_to_json(deduped_records, output_path)
 
-    logging.info("Done.")
+    return deduped_records
+
+def report_baseline_diff(
+    baseline_path: Path,
+    records: List[Dict[str, Any]],
+    diff_output: Optional[str] = None,
+) -> None:
+    logging.info("Diffing against baseline %s", baseline_path)
+    diff = diff_records(load_dataset(baseline_path), records)
+    logging.info(
+        "Baseline diff: %d added, %d removed, %d changed",
+        len(diff["added"]),
+        len(diff["removed"]),
+        len(diff["changed"]),
+    )
+    if diff_output:
+        diff_path = Path(diff_output)
+        diff_path.parent.mkdir(parents=True, exist_ok=True)
+        with diff_path.open("w", encoding="utf-8") as f:
+            json.dump(diff, f, ensure_ascii=False, indent=2)
+        logging.info("Diff written to %s", diff_output)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import json
+
+import runner
+from processor.dataset_diff import diff_records
+
+def _record(name, url=None, address=None, phone=None):
+    return {"name": name, "address": address, "phone": phone, "url": url}
+
+def test_added_removed_and_changed():
+    baseline = [
+        _record("Kept", url="https://mapy.com/kept", phone="+420111"),
+        _record("Gone", url="https://mapy.com/gone"),
+        _record("Same", url="https://mapy.com/same"),
+    ]
+    current = [
+        _record("Kept", url="https://mapy.com/kept", phone="+420222"),
+        _record("Same", url="https://mapy.com/same"),
+        _record("New", url="https://mapy.com/new"),
+    ]
+
+    diff = diff_records(baseline, current)
+
+    assert [rec["name"] for rec in diff["added"]] == ["New"]
+    assert [rec["name"] for rec in diff["removed"]] == ["Gone"]
+    assert diff["changed"] == [
+        {
+            "key": "url:https://mapy.com/kept",
+            "fields": {"phone": {"baseline": "+420111", "current": "+420222"}},
+        }
+    ]
+
+def test_records_without_url_match_on_name_and_address():
+    baseline = [
+        _record("Lekarna U Andela", address="Jungmannova 18, Prague", phone="+420111"),
+        _record("Lekarna U Andela", address="Vodickova 1, Prague"),
+    ]
+    current = [
+        _record(" lekarna u andela ", address="JUNGMANNOVA 18, PRAGUE", phone="+420111"),
+        _record("Lekarna U Andela", address="Narodni 5, Prague"),
+    ]
+
+    diff = diff_records(baseline, current)
+
+    assert [rec["address"] for rec in diff["added"]] == ["Narodni 5, Prague"]
+    assert [rec["address"] for rec in diff["removed"]] == ["Vodickova 1, Prague"]
+    # Same key after normalization; only the raw name/address strings differ.
+    assert [entry["key"] for entry in diff["changed"]] == ["nameaddr:lekarna u andela|jungmannova 18, prague"]
+    assert set(diff["changed"][0]["fields"]) == {"name", "address"}
+
+def test_identical_datasets_produce_empty_diff():
+    records = [_record("A", url="https://mapy.com/a"), _record("B", address="Street 1")]
+    assert diff_records(records, list(records)) == {"added": [], "removed": [], "changed": []}
+
+def test_report_baseline_diff_writes_diff_output(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(
+        json.dumps([_record("Gone", url="https://mapy.com/gone"), _record("Kept", url="https://mapy.com/kept")]),
+        encoding="utf-8",
+    )
+    current = [_record("Kept", url="https://mapy.com/kept", phone="+420222"), _record("New", url="https://mapy.com/new")]
+    diff_path = tmp_path / "out" / "diff.json"
+
+    runner.report_baseline_diff(baseline_path, current, str(diff_path))
+
+    written = json.loads(diff_path.read_text(encoding="utf-8"))
+    assert written == diff_records(json.loads(baseline_path.read_text(encoding="utf-8")), current)
+    assert [rec["name"] for rec in written["added"]] == ["New"]
+    assert [rec["name"] for rec in written["removed"]] == ["Gone"]
+    assert written["changed"][0]["fields"] == {"phone": {"baseline": None, "current": "+420222"}}
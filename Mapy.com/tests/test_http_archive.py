@@ -0,0 +1,116 @@
+from extractors.http_archive import FETCH_FAILED_STATUS, ArchiveReader, ArchiveWriter
+from extractors.mapy_parser import MapyScraper
+
+class _FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+class _FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        self.calls.append(url)
+        return _FakeResponse(*self.pages[url])
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "pages.arc"
+    with ArchiveWriter(path) as writer:
+        writer.record("https://mapy.com/a", 200, "<h1>Lékárna</h1>")
+        writer.record("https://mapy.com/b", 404, None)
+        writer.record("https://mapy.com/c", FETCH_FAILED_STATUS, None)
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 3
+        assert reader.get("https://mapy.com/a") == (200, "<h1>Lékárna</h1>")
+        assert reader.get("https://mapy.com/b") == (404, "")
+        assert reader.get("https://mapy.com/c") == (FETCH_FAILED_STATUS, "")
+        assert reader.get("https://mapy.com/missing") == (None, None)
+
+def test_later_run_replaces_failed_frame(tmp_path):
+    path = tmp_path / "pages.arc"
+    with ArchiveWriter(path) as writer:
+        writer.record("u", 503, None)
+    with ArchiveWriter(path) as writer:
+        writer.record("u", 200, "ok")
+    with ArchiveWriter(path) as writer:
+        writer.record("u", 200, "ignored")
+
+    with ArchiveReader(path) as reader:
+        assert reader.get("u") == (200, "ok")
+
+def test_refresh_records_again(tmp_path):
+    path = tmp_path / "pages.arc"
+    with ArchiveWriter(path) as writer:
+        writer.record("u", 200, "old")
+    with ArchiveWriter(path, refresh=True) as writer:
+        writer.record("u", 200, "new")
+
+    with ArchiveReader(path) as reader:
+        assert reader.get("u") == (200, "new")
+
+def test_refresh_keeps_success_on_failure(tmp_path):
+    path = tmp_path / "pages.arc"
+    with ArchiveWriter(path) as writer:
+        writer.record("u", 200, "good")
+    with ArchiveWriter(path, refresh=True) as writer:
+        writer.record("u", 503, None)
+        writer.record("v", FETCH_FAILED_STATUS, None)
+
+    with ArchiveReader(path) as reader:
+        assert reader.get("u") == (200, "good")
+        assert reader.get("v") == (FETCH_FAILED_STATUS, "")
+
+def test_long_url(tmp_path):
+    path = tmp_path / "pages.arc"
+    url = "https://mapy.com/?q=" + "x" * 70000
+    with ArchiveWriter(path) as writer:
+        writer.record(url, 200, "body")
+
+    with ArchiveReader(path) as reader:
+        assert reader.get(url) == (200, "body")
+
+def test_truncated_tail_is_ignored_and_dropped_on_append(tmp_path):
+    path = tmp_path / "pages.arc"
+    with ArchiveWriter(path) as writer:
+        writer.record("a", 200, "first")
+        writer.record("b", 200, "second")
+    size = path.stat().st_size
+    with path.open("r+b") as f:
+        f.truncate(size - 3)
+
+    with ArchiveReader(path) as reader:
+        assert reader.urls() == ["a"]
+        valid_size = reader.valid_size
+    assert valid_size < path.stat().st_size
+
+    with ArchiveWriter(path) as writer:
+        writer.record("c", 200, "third")
+
+    with ArchiveReader(path) as reader:
+        assert reader.urls() == ["a", "c"]
+        assert reader.get("c") == (200, "third")
+        assert reader.valid_size == path.stat().st_size
+
+def test_record_then_replay_fetch(tmp_path):
+    path = tmp_path / "pages.arc"
+    pages = {
+        "https://mapy.com/a": (200, "<html>a</html>"),
+        "https://mapy.com/gone": (404, "not found"),
+    }
+
+    with ArchiveWriter(path) as writer:
+        scraper = MapyScraper("https://mapy.com", max_retries=1, record_archive=writer)
+        scraper._session = _FakeSession(pages)
+        assert scraper._fetch_with_retries("https://mapy.com/a") == "<html>a</html>"
+        assert scraper._fetch_with_retries("https://mapy.com/gone") is None
+
+    with ArchiveReader(path) as reader:
+        replay = MapyScraper("https://mapy.com", replay_archive=reader)
+        assert replay._fetch_with_retries("https://mapy.com/a") == "<html>a</html>"
+        assert replay._fetch_with_retries("https://mapy.com/gone") is None
+        assert replay._fetch_with_retries("https://mapy.com/unknown") is None
+        # Replay never opens a network session.
+        assert replay._session is None
@@ -0,0 +1,76 @@
+import csv
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import runner
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "dataset.json"
+    path.write_text(
+        json.dumps([{"name": "Lekarna U Andela", "category": "Pharmacy", "url": "https://mapy.com/a"}]),
+        encoding="utf-8",
+    )
+    return path
+
+@pytest.mark.parametrize("log_before_subcommand", [True, False])
+def test_log_level_before_or_after_subcommand(monkeypatch, tmp_path, dataset, log_before_subcommand):
+    levels = []
+    monkeypatch.setattr(runner, "configure_logging", levels.append)
+    output = tmp_path / "out.csv"
+
+    command = ["export", "--input", str(dataset), "--output", str(output)]
+    if log_before_subcommand:
+        argv = ["--log-level", "DEBUG"] + command
+    else:
+        argv = command + ["--log-level", "DEBUG"]
+    runner.main(argv)
+
+    assert levels == ["DEBUG"]
+    with output.open(encoding="utf-8", newline="") as f:
+        assert [row["name"] for row in csv.DictReader(f)] == ["Lekarna U Andela"]
+
+def test_subcommand_does_not_import_parser_stack(tmp_path, dataset):
+    # A fresh interpreter, since other tests in this session import the scraper.
+    probe = (
+        "import sys, runner\n"
+        f"runner.main(['export', '--input', {str(dataset)!r}, '--output', {str(tmp_path / 'out.json')!r}])\n"
+        "print(','.join(m for m in ('extractors.mapy_parser', 'bs4', 'requests') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=Path(runner.__file__).parent,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == ""
+    assert (tmp_path / "out.json").exists()
+
+@pytest.mark.parametrize(
+    "query_args,message",
+    [
+        (["--nearest", "3", "--lat", "nan", "--lng", "14"], "--lat"),
+        (["--nearest", "3", "--lat", "95", "--lng", "14"], "--lat"),
+        (["--nearest", "3", "--lat", "50", "--lng", "inf"], "--lng"),
+        (["--radius-m", "nan", "--lat", "50", "--lng", "14"], "--radius-m"),
+        (["--radius-m", "-5", "--lat", "50", "--lng", "14"], "--radius-m"),
+        (["--bbox", "51", "14", "50", "15"], "--bbox"),
+        (["--bbox", "50", "14", "51", "nan"], "--bbox"),
+    ],
+)
+def test_query_rejects_invalid_coordinates(monkeypatch, capsys, tmp_path, query_args, message):
+    monkeypatch.setattr(runner, "configure_logging", lambda level: None)
+    sidecar = tmp_path / "dataset.sidx"
+    runner.export_to_spatial_index([], sidecar)
+
+    with pytest.raises(SystemExit) as excinfo:
+        runner.main(["query", "--index", str(sidecar)] + query_args)
+
+    assert excinfo.value.code == 2
+    assert message in capsys.readouterr().err
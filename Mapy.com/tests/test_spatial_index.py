@@ -0,0 +1,154 @@
+import random
+
+import pytest
+
+from outputs.spatial_index import MIN_CELL_SIZE_DEG, SpatialIndex, export_to_spatial_index, haversine_m
+
+CATEGORIES = ["Pharmacy", "Restaurant", "Bank"]
+
+@pytest.fixture(scope="module")
+def records():
+    rng = random.Random(7)
+    rows = []
+    for i in range(3000):
+        if i % 10 == 0:
+            coords = None
+        elif i % 3 == 0:
+            coords = {"lat": rng.uniform(-90, 90), "lng": rng.uniform(-180, 180)}
+        else:
+            # Clusters around Prague and on both sides of the antimeridian.
+            center = rng.choice([14.42, 179.95, -179.95])
+            lng = max(-180.0, min(180.0, center + rng.uniform(-0.2, 0.2)))
+            coords = {"lat": 50.08 + rng.uniform(-0.3, 0.3), "lng": lng}
+        rows.append(
+            {
+                "name": f"Shop {i}" + (" U Andela" if i % 7 == 0 else ""),
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "coordinates": coords,
+                "url": f"https://mapy.com/{i}",
+            }
+        )
+    return rows
+
+@pytest.fixture(scope="module")
+def index(records, tmp_path_factory):
+    path = tmp_path_factory.mktemp("sidx") / "dataset.sidx"
+    export_to_spatial_index(records, path)
+    with SpatialIndex(path) as idx:
+        yield idx
+
+def _located(records, category=None):
+    for rec in records:
+        if rec["coordinates"] is None:
+            continue
+        if category is not None and rec["category"].lower() != category.lower():
+            continue
+        yield rec
+
+def _distances(records, lat, lng, category=None):
+    return sorted(
+        (haversine_m(lat, lng, rec["coordinates"]["lat"], rec["coordinates"]["lng"]), rec["url"])
+        for rec in _located(records, category)
+    )
+
+QUERY_POINTS = [(50.08, 14.42), (50.1, 180.0), (50.0, -179.99), (89.9, 0.0), (-45.0, 100.0)]
+
+@pytest.mark.parametrize("lat,lng", QUERY_POINTS)
+@pytest.mark.parametrize("radius_m", [500, 5000, 60000, 3000000])
+@pytest.mark.parametrize("category", [None, "pharmacy"])
+def test_radius_matches_brute_force(index, records, lat, lng, radius_m, category):
+    expected = [url for dist, url in _distances(records, lat, lng, category) if dist <= radius_m]
+    got = [rec["url"] for _, rec in index.radius(lat, lng, radius_m, category=category)]
+    assert got == expected
+
+@pytest.mark.parametrize("lat,lng", QUERY_POINTS)
+@pytest.mark.parametrize("k", [1, 10, 100])
+@pytest.mark.parametrize("category", [None, "bank"])
+def test_nearest_matches_brute_force(index, records, lat, lng, k, category):
+    expected = [dist for dist, _ in _distances(records, lat, lng, category)[:k]]
+    got = [dist for dist, _ in index.nearest(lat, lng, k, category=category)]
+    assert got == pytest.approx(expected)
+
+@pytest.mark.parametrize(
+    "south,west,north,east",
+    [
+        (49.9, 14.2, 50.3, 14.6),
+        (49.8, 179.8, 50.4, -179.8),  # crosses the antimeridian
+        (-90.0, -180.0, 90.0, 180.0),
+        (10.0, 170.0, 60.0, -170.0),
+    ],
+)
+def test_bbox_matches_brute_force(index, records, south, west, north, east):
+    def inside(rec):
+        lat, lng = rec["coordinates"]["lat"], rec["coordinates"]["lng"]
+        in_lng = west <= lng <= east if west <= east else (lng >= west or lng <= east)
+        return south <= lat <= north and in_lng
+
+    expected = sorted(rec["url"] for rec in _located(records) if inside(rec))
+    got = sorted(rec["url"] for rec in index.bbox(south, west, north, east))
+    assert got == expected
+    assert expected
+
+def test_search_and_limit(index, records):
+    expected = [rec["url"] for rec in records if rec["category"] == "Bank" and "U Andela" in rec["name"]]
+    assert [rec["url"] for rec in index.search(category="BANK", name="u andela")] == expected
+    assert len(index.search(category="bank", name="u andela", limit=3)) == 3
+    assert len(index.bbox(-90, -180, 90, 180, limit=5)) == 5
+
+def test_unfiltered_queries_never_touch_term_tables(records, tmp_path, monkeypatch):
+    path = tmp_path / "dataset.sidx"
+    export_to_spatial_index(records, path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("term table accessed")
+
+    monkeypatch.setattr(SpatialIndex, "_term_at", fail)
+    with SpatialIndex(path) as idx:
+        assert idx.radius(50.08, 14.42, 2000)
+        assert idx.bbox(49.9, 14.2, 50.3, 14.6)
+        assert len(idx.nearest(50.08, 14.42, 5)) == 5
+
+def test_non_ascii_terms(tmp_path):
+    rows = [
+        {"name": "Lékárna Žižkov", "category": "Lékárna", "coordinates": None, "url": "https://mapy.com/1"},
+        {"name": "Café Louvre", "category": "Café", "coordinates": None, "url": "https://mapy.com/2"},
+        {"name": "Apotheke Zürich", "category": "Ärzte", "coordinates": None, "url": "https://mapy.com/3"},
+    ]
+    path = tmp_path / "dataset.sidx"
+    export_to_spatial_index(rows, path)
+
+    with SpatialIndex(path) as idx:
+        assert [rec["url"] for rec in idx.search(category="LÉKÁRNA")] == ["https://mapy.com/1"]
+        assert [rec["url"] for rec in idx.search(name="žižkov")] == ["https://mapy.com/1"]
+        assert [rec["url"] for rec in idx.search(category="ärzte", name="zürich")] == ["https://mapy.com/3"]
+        assert idx.search(category="pharmacy") == []
+
+@pytest.mark.parametrize("cell_size", [0.0, -1.0, float("nan"), float("inf"), 1e-7, 1e-9])
+def test_invalid_cell_size_is_rejected(tmp_path, cell_size):
+    with pytest.raises(ValueError, match="cell_size_deg"):
+        export_to_spatial_index([], tmp_path / "dataset.sidx", cell_size_deg=cell_size)
+
+def test_fine_grid_skips_empty_rows(tmp_path, records):
+    sample = records[:300]
+    path = tmp_path / "dataset.sidx"
+    export_to_spatial_index(sample, path, cell_size_deg=MIN_CELL_SIZE_DEG)
+
+    with SpatialIndex(path) as idx:
+        # Full-globe scans touch only non-empty rows, so these finish quickly
+        # even though the grid has 18 million latitude rows.
+        expected = sorted(rec["url"] for rec in _located(sample))
+        assert sorted(rec["url"] for rec in idx.bbox(-90, -180, 90, 180)) == expected
+        lat, lng = 50.08, 14.42
+        expected_nearest = [dist for dist, _ in _distances(sample, lat, lng)[:5]]
+        assert [dist for dist, _ in idx.nearest(lat, lng, 5)] == pytest.approx(expected_nearest)
+
+def test_categories(index):
+    assert index.categories() == sorted(c.lower() for c in CATEGORIES)
+
+def test_corrupt_sidecar_raises_value_error(records, tmp_path):
+    path = tmp_path / "dataset.sidx"
+    export_to_spatial_index(records[:20], path)
+    path.write_bytes(path.read_bytes()[:-5])
+
+    with pytest.raises(ValueError, match="Not a Mapy spatial index"):
+        SpatialIndex(path)